@@ -0,0 +1,96 @@
+import os
+import time
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from reportparser import load_report
+from bulkparser import pack_report, parse_reports
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_REPORT = os.path.join(HERE, "testreport.xml")
+MIN_PARALLEL_EFFICIENCY = float(os.environ.get("NEBULOUS_MIN_PARALLEL_EFFICIENCY", "0.6"))
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class BulkParserTestCase(unittest.TestCase):
+    def make_library(self, count):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        paths = []
+        for index in range(count):
+            path = os.path.join(workdir, f"report {index}.xml")
+            shutil.copy(TEST_REPORT, path)
+            paths.append(path)
+        return workdir, paths
+
+
+class PackReportTest(unittest.TestCase):
+    def test_round_trip(self):
+        report = load_report(TEST_REPORT)
+        self.assertEqual(pack_report(report, TEST_REPORT).to_parsed_report(), report)
+
+    def test_pickles_smaller_than_parsed_report(self):
+        report = load_report(TEST_REPORT)
+        compact = pack_report(report, TEST_REPORT)
+        self.assertEqual(pickle.loads(pickle.dumps(compact)), compact)
+        self.assertLess(len(pickle.dumps(compact)), len(pickle.dumps(report)))
+
+    def test_reduce_does_not_copy_arrays(self):
+        compact = pack_report(load_report(TEST_REPORT), TEST_REPORT)
+        args = compact.__reduce__()[1]
+        for array_field in (compact.ammo_pct, compact.restores, compact.items, compact.counts):
+            self.assertTrue(any(arg is array_field for arg in args))
+
+
+class ParseReportsTest(BulkParserTestCase):
+    def check_library(self, workers):
+        workdir, paths = self.make_library(12)
+        bad_path = os.path.join(workdir, "bad.xml")
+        with open(bad_path, "w") as f:
+            f.write("not xml")
+        missing_path = os.path.join(workdir, "missing.xml")
+
+        with self.assertLogs(level="ERROR") as logs:
+            results = list(parse_reports(paths + [bad_path, missing_path], workers=workers, chunksize=5))
+
+        self.assertEqual(sorted(result.path for result in results), sorted(paths))
+        expected = load_report(TEST_REPORT)
+        for result in results:
+            self.assertEqual(result.to_parsed_report(), expected)
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn("bad.xml", logs.output[0] + logs.output[1])
+        self.assertIn("missing.xml", logs.output[0] + logs.output[1])
+
+    def test_in_process(self):
+        self.check_library(workers=1)
+
+    def test_process_pool(self):
+        self.check_library(workers=2)
+
+
+@unittest.skipUnless(available_cores() >= 2, "parallel scaling needs at least two cores")
+class ParallelScalingTest(BulkParserTestCase):
+    def test_throughput_scales_with_workers(self):
+        workers = min(available_cores(), 4)
+        _, paths = self.make_library(100 * workers)
+
+        def reports_per_sec(worker_count):
+            start = time.perf_counter()
+            parsed = sum(1 for _ in parse_reports(paths, workers=worker_count))
+            return parsed / (time.perf_counter() - start)
+
+        serial = reports_per_sec(1)
+        parallel = reports_per_sec(workers)
+        # Pool start-up is included, so allow some loss against perfect scaling
+        self.assertGreaterEqual(parallel / serial, workers * MIN_PARALLEL_EFFICIENCY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import logging
+
+import xmlbackend
+from fleetparser import SHIPS, BULK_MAGAZINE_LOADS, CELL_LAUNCHER_LOADS
+
+def update_fleet_with_report(fleet_path, fleet_data, report):
+    logging.info(f"Updating fleet with report: {fleet_path}")
+    for fleet_ship in fleet_data:
+        ship_report = report.ships_by_name.get(fleet_ship["Name"])
+        if ship_report is None:
+            continue
+        # Update munitions remains unchanged
+        for munition, details in ship_report.get("munitions", {}).items():
+            if munition in fleet_ship["munitions"]:
+                fleet_ship["munitions"][munition] -= details["shots_fired"]
+                if fleet_ship["munitions"][munition] < 0:
+                    fleet_ship["munitions"][munition] = 0
+        # Update missiles using report values:
+        for missile, rep_details in ship_report.get("missiles", {}).items():
+            # Use the reported totals if provided; otherwise, fall back to the campaign fleet value.
+            report_total = rep_details.get("total_carried")
+            report_expended = rep_details.get("total_expended", 0)
+            if report_total is not None:
+                new_remainder = report_total - report_expended
+                fleet_ship["missiles"][missile] = new_remainder
+            else:
+                # Leave the fleet's original value if no report info is provided.
+                pass
+    save_updated_fleet(fleet_path, fleet_data)
+
+def _missile_key(munition_key):
+    key = munition_key.strip()
+    if key.lower().startswith("$modmis$/"):
+        key = key[len("$modmis$/"):].strip()
+    return key
+
+def _drain_total(nodes, total):
+    """
+    Sets the combined munition Quantity of nodes to total. A shortfall is
+    drained from the magazines in order, keeping the load of the others, and a
+    surplus is spread evenly; nodes are untouched when the total is unchanged.
+    """
+    quantities = [int(node.find("Quantity").text) for node in nodes]
+    deficit = sum(quantities) - total
+    if deficit < 0:
+        base_val, extra = divmod(-deficit, len(nodes))
+        for idx, (node, quantity) in enumerate(zip(nodes, quantities)):
+            node.find("Quantity").text = str(quantity + base_val + (1 if idx < extra else 0))
+        return
+    for node, quantity in zip(nodes, quantities):
+        if deficit <= 0:
+            break
+        used = min(quantity, deficit)
+        node.find("Quantity").text = str(quantity - used)
+        deficit -= used
+
+def _spread_total(nodes, total):
+    """
+    Splits a changed missile total evenly across all of a ship's matching
+    launcher and magazine nodes, as the per-launcher code did before; nodes are
+    untouched when the total is unchanged.
+    """
+    if sum(int(node.find("Quantity").text) for node in nodes) == total:
+        return
+    base_val, extra = divmod(total, len(nodes))
+    for idx, node in enumerate(nodes):
+        node.find("Quantity").text = str(base_val + (1 if idx < extra else 0))
+
+def save_updated_fleet(fleet_path, fleet_data):
+    logging.info(f"Saving updated fleet: {fleet_path}")
+    tree = xmlbackend.parse(fleet_path)
+    root = tree.getroot()
+
+    # Update the fleet's Name element to match the base filename (e.g., "blast battle 1")
+    new_fleet_name = os.path.splitext(os.path.basename(fleet_path))[0]
+    name_elem = root.find("Name")
+    if name_elem is not None:
+        name_elem.text = new_fleet_name
+    else:
+        name_elem = xmlbackend.new_element("Name")
+        name_elem.text = new_fleet_name
+        root.insert(0, name_elem)
+
+    # ...existing code for updating munitions and missiles...
+    fleet_ships_by_name = {fleet_ship["Name"]: fleet_ship for fleet_ship in fleet_data}
+    for ship in SHIPS(root):
+        fleet_ship = fleet_ships_by_name.get(ship.find("Name").text)
+        if fleet_ship is not None:
+            # parse_fleet sums each munition and missile over all of a ship's
+            # magazines and launchers, so set each total across every matching
+            # node at once instead of writing the ship total into each of them.
+            magazines = {}
+            for mag_save_data in BULK_MAGAZINE_LOADS(ship):
+                magazines.setdefault(mag_save_data.find("MunitionKey").text.strip(), []).append(mag_save_data)
+            for munition_key, nodes in magazines.items():
+                if munition_key in fleet_ship["munitions"]:
+                    _drain_total(nodes, fleet_ship["munitions"][munition_key])
+
+            # Missile keys from the report have no "$MODMIS$/" prefix; they come
+            # after the fleet's own keys, so their totals win.
+            missile_totals = {}
+            for missile_key, remaining in fleet_ship["missiles"].items():
+                missile_totals[_missile_key(missile_key)] = remaining
+            # Modular missiles in bulk magazines count as missiles in parse_fleet
+            launchers = {}
+            for munition_key, nodes in magazines.items():
+                if munition_key.startswith("$MODMIS$/"):
+                    launchers.setdefault(_missile_key(munition_key), []).extend(nodes)
+            for mag_save_data in CELL_LAUNCHER_LOADS(ship):
+                launchers.setdefault(_missile_key(mag_save_data.find("MunitionKey").text), []).append(mag_save_data)
+            for missile_key, nodes in launchers.items():
+                if missile_key in missile_totals:
+                    _spread_total(nodes, missile_totals[missile_key])
+
+    xmlbackend.write(tree, fleet_path)
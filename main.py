@@ -1,14 +1,20 @@
 import os
 import time
+import argparse
 import shutil
 import logging
 import pprint  # new import for formatted printing
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-import xml.etree.ElementTree as ET
-from reportparser import parse_report
+import xmlbackend
+from xmlbackend import XPath
+from reportparser import load_report
 from fleetparser import parse_fleet
+from fleetupdater import update_fleet_with_report
+from stateserver import CampaignState, start_query_server
+
+FLEET_SHIP_NAMES = XPath("Ships/Ship/Name")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -38,36 +44,48 @@ if not os.path.exists(IN_THEATER_DIR):
 
 logging.info(f"Monitoring directory: {REPORTS_DIR}")
 
+STATE = CampaignState()  # Latest report/fleet/metrics, served by --query-port
+
 class ReportHandler(FileSystemEventHandler):
     def on_created(self, event):
         logging.info(f"File created: {event.src_path}")  # Log file creation
         if event.src_path.endswith(".xml"):
             time.sleep(1)  # Delay to allow the report to fully populate
-            process_skirmish_report(event.src_path)
+            start = time.perf_counter()
+            succeeded = False
+            try:
+                succeeded = process_skirmish_report(event.src_path)
+            finally:
+                STATE.record_processing(event.src_path, time.perf_counter() - start, succeeded)
+
+class CacheInvalidationHandler(FileSystemEventHandler):
+    """Keeps STATE in step with report and fleet files changed outside the pipeline."""
+    def on_modified(self, event):
+        if not event.is_directory:
+            STATE.refresh(event.src_path)
+
+    def on_deleted(self, event):
+        STATE.invalidate(event.src_path)
+
+    def on_moved(self, event):
+        STATE.invalidate(event.src_path)
 
 def process_skirmish_report(report_path):
     logging.info(f"Processing report: {report_path}")
     try:
-        report_data = {"ships": parse_report(report_path)}
+        report = load_report(report_path)
         # Pretty-print report data in a readable format
-        pprinter.pprint({"Report Information": report_data})
-        tree = ET.parse(report_path)
-        root = tree.getroot()
-        fleet_prefix_elem = root.find(".//Colors/FleetPrefix")
-        fleet_prefix = fleet_prefix_elem.text.strip() if fleet_prefix_elem is not None else ""
+        pprinter.pprint({"Report Information": report})
     except PermissionError:
         logging.error(f"Permission denied: {report_path}")
-        return
+        return False
     except Exception as e:
         logging.error(f"Failed to process report {report_path}: {e}")
-        return
-
-    active_ships = []
-    for ship in report_data.get("ships", []):
-        name = ship["ship_name"]
-        if fleet_prefix and name.startswith(fleet_prefix):
-            name = name[len(fleet_prefix):].strip()
-        active_ships.append(name)
+        return False
+    STATE.publish_report(report_path, report)
+
+    # Ship names in the parsed report already have the fleet prefix stripped
+    active_ships = list(report.ships_by_name)
     logging.info(f"Active ships (without prefix): {active_ships}")
 
     campaign_fleet_path = find_matching_fleet(active_ships)
@@ -92,136 +110,40 @@ def process_skirmish_report(report_path):
                 raise ValueError("parse_fleet returned None")
         except Exception as e:
             logging.error(f"Failed to copy/parse fleet {campaign_fleet_path}: {e}")
-            return
-        update_fleet_with_report(target_fleet_path, fleet_data, report_data)
-    else:
-        logging.info("No matching fleet found")
+            return False
+        update_fleet_with_report(target_fleet_path, fleet_data, report)
 
-def update_fleet_with_report(fleet_path, fleet_data, report_data):
-    logging.info(f"Updating fleet with report: {fleet_path}")
-    for ship_report in report_data.get("ships", []):
-        report_ship_name = ship_report["ship_name"]
-        for fleet_ship in fleet_data:
-            if fleet_ship["Name"] == report_ship_name:
-                # Update munitions remains unchanged
-                for munition, details in ship_report.get("munitions", {}).items():
-                    if munition in fleet_ship["munitions"]:
-                        fleet_ship["munitions"][munition] -= details["shots_fired"]
-                        if fleet_ship["munitions"][munition] < 0:
-                            fleet_ship["munitions"][munition] = 0
-                # Update missiles using report values:
-                for missile, rep_details in ship_report.get("missiles", {}).items():
-                    # Use the reported totals if provided; otherwise, fall back to the campaign fleet value.
-                    report_total = rep_details.get("total_carried")
-                    report_expended = rep_details.get("total_expended", 0)
-                    if report_total is not None:
-                        new_remainder = report_total - report_expended
-                        fleet_ship["missiles"][missile] = new_remainder
-                    else:
-                        # Leave the fleet's original value if no report info is provided.
-                        pass
-    save_updated_fleet(fleet_path, fleet_data)
-
-def save_updated_fleet(fleet_path, fleet_data):
-    logging.info(f"Saving updated fleet: {fleet_path}")
-    tree = ET.parse(fleet_path)
-    root = tree.getroot()
-
-    # Update the fleet's Name element to match the base filename (e.g., "blast battle 1")
-    new_fleet_name = os.path.splitext(os.path.basename(fleet_path))[0]
-    name_elem = root.find("Name")
-    if name_elem is not None:
-        name_elem.text = new_fleet_name
+        # After writing, re-parse the fleet file and print the updated fleet information
+        updated_fleet = parse_fleet(target_fleet_path)
+        pprinter.pprint({"Updated Fleet Information": updated_fleet})
+        STATE.publish_fleet(target_fleet_path, updated_fleet)
     else:
-        name_elem = ET.Element("Name")
-        name_elem.text = new_fleet_name
-        root.insert(0, name_elem)
-
-    # ...existing code for updating munitions and missiles...
-    for fleet_ship in fleet_data:
-        for ship in root.findall("Ships/Ship"):
-            if ship.find("Name").text == fleet_ship["Name"]:
-                # Update munitions
-                for hull_socket in ship.find("SocketMap").findall("HullSocket"):
-                    component_data = hull_socket.find("ComponentData")
-                    if (component_data is not None and
-                        component_data.attrib.get('{http://www.w3.org/2001/XMLSchema-instance}type') == 'BulkMagazineData'):
-                        load = component_data.find("Load")
-                        if load is not None:
-                            for mag_save_data in load.findall("MagSaveData"):
-                                munition_key = mag_save_data.find("MunitionKey").text
-                                if munition_key in fleet_ship["munitions"]:
-                                    mag_save_data.find("Quantity").text = str(fleet_ship["munitions"][munition_key])
-                    # Update missiles with even distribution per magazine
-                    if (component_data is not None and
-                        component_data.attrib.get('{http://www.w3.org/2001/XMLSchema-instance}type') == 'ResizableCellLauncherData'):
-                        missile_load = component_data.find("MissileLoad")
-                        if missile_load is not None:
-                            # For each missile type that was updated:
-                            for missile_key, remaining in fleet_ship["missiles"].items():
-                                # Gather all MagSaveData nodes with this missile_key
-                                matching_nodes = []
-                                for mag_save_data in missile_load.findall("MagSaveData"):
-                                    key = mag_save_data.find("MunitionKey").text.strip()
-                                    if key.lower().startswith("$modmis$/"):
-                                        key = key[len("$modmis$/"):].strip()
-                                    if key == missile_key:
-                                        matching_nodes.append(mag_save_data)
-                                if matching_nodes:
-                                    count = len(matching_nodes)
-                                    base_val = remaining // count
-                                    extra = remaining % count
-                                    for idx, node in enumerate(matching_nodes):
-                                        new_qty = base_val + (1 if idx < extra else 0)
-                                        node.find("Quantity").text = str(new_qty)
-
-                    # Distribute updated missile quantities across BulkMagazineData
-                    if (component_data is not None and
-                        component_data.attrib.get('{http://www.w3.org/2001/XMLSchema-instance}type') == 'BulkMagazineData'):
-                        load = component_data.find("Load")
-                        if load is not None:
-                            for missile_key, remaining in fleet_ship["missiles"].items():
-                                # Gather all MagSaveData nodes with this missile_key
-                                matching_nodes = []
-                                for mag_save_data in load.findall("MagSaveData"):
-                                    key = mag_save_data.find("MunitionKey").text.strip()
-                                    if key.lower().startswith("$modmis$/"):
-                                        key = key[len("$modmis$/"):].strip()
-                                    if key == missile_key:
-                                        matching_nodes.append(mag_save_data)
-                                # Distribute evenly
-                                if matching_nodes:
-                                    count = len(matching_nodes)
-                                    base_val = remaining // count
-                                    extra = remaining % count
-                                    for i, node in enumerate(matching_nodes):
-                                        new_qty = base_val + (1 if i < extra else 0)
-                                        node.find("Quantity").text = str(new_qty)
-
-    tree.write(fleet_path, xml_declaration=True, encoding='utf-8', method="xml")
-    
-    # After writing, re-parse the fleet file and print the updated fleet information
-    from fleetparser import parse_fleet  # Ensure we have access to parse_fleet
-    updated_fleet = parse_fleet(fleet_path)
-    pprinter.pprint({"Updated Fleet Information": updated_fleet})
+        logging.info("No matching fleet found")
+    return True
 
 def find_matching_fleet(ship_names):
     campaign_fleets_dir = os.path.join(FLEETS_DIR, "Campaign Fleets")
     logging.info(f"Finding matching fleet for ships: {ship_names} in {campaign_fleets_dir}")
     for fleet_file in os.listdir(campaign_fleets_dir):
         if fleet_file.endswith(".fleet"):
-            tree = ET.parse(os.path.join(campaign_fleets_dir, fleet_file))
+            tree = xmlbackend.parse(os.path.join(campaign_fleets_dir, fleet_file))
             root = tree.getroot()
-            fleet_ships = [ship.find("Name").text for ship in root.findall("Ships/Ship")]
+            fleet_ships = [name.text for name in FLEET_SHIP_NAMES(root)]
             logging.info(f"Fleet ships: {fleet_ships}")
             if set(ship_names).issubset(set(fleet_ships)):
                 return os.path.join(campaign_fleets_dir, fleet_file)
     return None
 
-def monitor_reports():
+def monitor_reports(query_port=None):
     observer = Observer()
     event_handler = ReportHandler()
     observer.schedule(event_handler, REPORTS_DIR, recursive=False)
+    server = None
+    if query_port is not None:
+        invalidation_handler = CacheInvalidationHandler()
+        observer.schedule(invalidation_handler, REPORTS_DIR, recursive=False)
+        observer.schedule(invalidation_handler, IN_THEATER_DIR, recursive=False)
+        server = start_query_server(STATE, query_port)
     observer.start()
     
     logging.info("Monitoring skirmish reports for new files...")
@@ -231,6 +153,12 @@ def monitor_reports():
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    if server is not None:
+        server.shutdown()
 
 if __name__ == "__main__":
-    monitor_reports()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Save fleet state for Nebulous")
+    parser.add_argument("--query-port", type=int, default=None,
+                        help="serve the latest report, fleet and metrics as JSON on 127.0.0.1:PORT")
+    args = parser.parse_args()
+    monitor_reports(query_port=args.query_port)
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+Golden-file regression and throughput checks for the report -> fleet pipeline.
+
+Set NEBULOUS_UPDATE_GOLDEN=1 to rewrite the files in golden/ after an
+intentional change to the fleet output.
+
+Throughput floors are set NEBULOUS_PERF_TOLERANCE (default 2.5) times away
+from the BASELINE_* numbers, which were measured with the stdlib backend on a
+development machine; ThroughputTest always runs on that backend. Re-measure
+and update the baselines when the pipeline gets intentionally faster or
+slower, or override a single floor with
+NEBULOUS_MIN_REPORTS_PER_SEC, NEBULOUS_MIN_FLEETS_PER_SEC or
+NEBULOUS_MAX_FLEET_WRITE_MS.
+"""
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import xmlbackend
+from reportparser import load_report
+from fleetparser import parse_fleet
+from fleetupdater import update_fleet_with_report, save_updated_fleet
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(HERE, "golden")
+TEST_REPORT = os.path.join(HERE, "testreport.xml")
+UPDATE_GOLDEN = os.environ.get("NEBULOUS_UPDATE_GOLDEN") == "1"
+
+BASELINE_REPORTS_PER_SEC = 550   # load_report(testreport.xml)
+BASELINE_FLEETS_PER_SEC = 1500   # parse_fleet(fleetout.fleet)
+BASELINE_FLEET_WRITE_MS = 2.0    # save_updated_fleet on fleetout.fleet
+PERF_TOLERANCE = float(os.environ.get("NEBULOUS_PERF_TOLERANCE", "2.5"))
+MIN_REPORTS_PER_SEC = float(os.environ.get("NEBULOUS_MIN_REPORTS_PER_SEC",
+                                           BASELINE_REPORTS_PER_SEC / PERF_TOLERANCE))
+MIN_FLEETS_PER_SEC = float(os.environ.get("NEBULOUS_MIN_FLEETS_PER_SEC",
+                                          BASELINE_FLEETS_PER_SEC / PERF_TOLERANCE))
+MAX_FLEET_WRITE_MS = float(os.environ.get("NEBULOUS_MAX_FLEET_WRITE_MS",
+                                          BASELINE_FLEET_WRITE_MS * PERF_TOLERANCE))
+
+
+def rename_local_ships(root, names):
+    """Renames the local player's ships, in order, keeping the fleet prefix."""
+    ships = root.findall(".//AARPlayerReportOfShipBattleReportCraftBattleReport[IsLocalPlayer='true']"
+                         "/Ships/ShipBattleReport/ShipName")
+    for ship_name, name in zip(ships, names):
+        ship_name.text = f"{ship_name.text.split(' ', 1)[0]} {name}"
+
+
+def use_fleet_munition_keys(root):
+    """
+    Renames weapon groups ("120mm Gun - 120mm AP Shell") to the fleet's
+    munition keys ("Stock/120mm AP Shell") so shots fired are subtracted, and
+    fires more HE-RPF shells than were carried to exercise the clamp at zero.
+    """
+    for weapon_report in root.iter("WeaponReport"):
+        group_name = weapon_report.find("GroupName")
+        munition = group_name.text.split(" - ", 1)[-1]
+        group_name.text = f"Stock/{munition}"
+        if munition == "120mm HE-RPF Shell":
+            weapon_report.find("ShotsFired").text = "5000"
+
+
+def expend_all_missiles(root):
+    for report in root.iter("OffensiveMissileReport"):
+        report.find("TotalExpended").text = report.find("TotalCarried").text
+
+
+# variant name -> (fleet file, function editing the report root or None)
+VARIANTS = {
+    "fleetout": ("fleetout.fleet", None),
+    "testfleet_unmatched": ("testfleet.fleet", None),
+    "testfleet_renamed": ("testfleet.fleet",
+                          lambda root: rename_local_ships(root, ["Jasmine H. Kaenel", "Mania Waxed"])),
+    "fleetout_all_expended": ("fleetout.fleet", expend_all_missiles),
+    "fleetout_munitions_fired": ("fleetout.fleet", use_fleet_munition_keys),
+}
+
+
+def canonical(path):
+    return ET.canonicalize(from_file=path, strip_text=True)
+
+
+class PipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        previous_backend = xmlbackend.get_backend().name
+        self.addCleanup(xmlbackend.set_backend, previous_backend)
+
+    def make_report(self, variant):
+        edit = VARIANTS[variant][1]
+        if edit is None:
+            return TEST_REPORT
+        tree = ET.parse(TEST_REPORT)
+        edit(tree.getroot())
+        report_path = os.path.join(self.workdir, f"{variant}.xml")
+        tree.write(report_path, xml_declaration=True, encoding="utf-8")
+        return report_path
+
+    def run_pipeline(self, variant, out_dir=None):
+        """Copies the variant's fleet, applies its report and returns the written fleet path."""
+        out_dir = out_dir or self.workdir
+        os.makedirs(out_dir, exist_ok=True)
+        fleet_path = os.path.join(out_dir, f"{variant}.fleet")
+        shutil.copy(os.path.join(HERE, VARIANTS[variant][0]), fleet_path)
+        update_fleet_with_report(fleet_path, parse_fleet(fleet_path), load_report(self.make_report(variant)))
+        return fleet_path
+
+
+class GoldenFleetTest(PipelineTestCase):
+    def test_fleet_output_matches_golden(self):
+        for variant in VARIANTS:
+            with self.subTest(variant=variant):
+                fleet_path = self.run_pipeline(variant)
+                golden_path = os.path.join(GOLDEN_DIR, f"{variant}.fleet")
+                if UPDATE_GOLDEN:
+                    os.makedirs(GOLDEN_DIR, exist_ok=True)
+                    shutil.copy(fleet_path, golden_path)
+                self.assertEqual(canonical(fleet_path), canonical(golden_path))
+
+    def test_report_ships_match_fleet_names(self):
+        report = load_report(self.make_report("testfleet_renamed"))
+        self.assertEqual(report.fleet_prefix, "ANS")
+        self.assertIn("Jasmine H. Kaenel", report.ships_by_name)
+        self.assertIn("Mania Waxed", report.ships_by_name)
+
+    def test_shots_fired_are_subtracted_and_clamped(self):
+        munitions = parse_fleet(self.run_pipeline("fleetout_munitions_fired"))[1]["munitions"]
+        self.assertEqual(munitions, {"Stock/120mm HE-RPF Shell": 0,
+                                     "Stock/120mm HE Shell": 1200,
+                                     "Stock/120mm AP Shell": 1000 - 117})
+
+    def test_unmatched_fleet_only_renames(self):
+        fleet_path = self.run_pipeline("testfleet_unmatched")
+        self.assertEqual(parse_fleet(fleet_path), parse_fleet(os.path.join(HERE, "testfleet.fleet")))
+        self.assertEqual(ET.parse(fleet_path).getroot().find("Name").text, "testfleet_unmatched")
+
+    def test_munitions_drain_across_magazines(self):
+        fleet_path = os.path.join(self.workdir, "drain.fleet")
+        shutil.copy(os.path.join(HERE, "testfleet.fleet"), fleet_path)
+        fleet_data = parse_fleet(fleet_path)
+        slugs = fleet_data[0]["munitions"]["Stock/20mm Slug"]
+        fleet_data[0]["munitions"]["Stock/20mm Slug"] = slugs - 100
+        save_updated_fleet(fleet_path, fleet_data)
+        self.assertEqual(parse_fleet(fleet_path)[0]["munitions"]["Stock/20mm Slug"], slugs - 100)
+
+    def test_unchanged_fleet_data_is_idempotent(self):
+        for name in ("testfleet.fleet", "fleetout.fleet"):
+            with self.subTest(fleet=name):
+                fleet_path = os.path.join(self.workdir, name)
+                shutil.copy(os.path.join(HERE, name), fleet_path)
+                original = parse_fleet(fleet_path)
+                for _ in range(3):
+                    save_updated_fleet(fleet_path, parse_fleet(fleet_path))
+                self.assertEqual(parse_fleet(fleet_path), original)
+
+    def test_missiles_spread_across_launchers(self):
+        fleet_path = os.path.join(self.workdir, "missiles.fleet")
+        shutil.copy(os.path.join(HERE, "fleetout.fleet"), fleet_path)
+        fleet_data = parse_fleet(fleet_path)
+        decoys = fleet_data[0]["missiles"]["Stock/EA99 Active Decoy"]
+        fleet_data[0]["missiles"]["Stock/EA99 Active Decoy"] = decoys - 5
+        save_updated_fleet(fleet_path, fleet_data)
+        self.assertEqual(parse_fleet(fleet_path)[0]["missiles"]["Stock/EA99 Active Decoy"], decoys - 5)
+
+    def test_missile_shortfall_is_split_evenly(self):
+        fleet_path = os.path.join(self.workdir, "missiles.fleet")
+        shutil.copy(os.path.join(HERE, "fleetout.fleet"), fleet_path)
+        fleet_data = parse_fleet(fleet_path)
+        # Report-style key without the "$MODMIS$/" prefix
+        fleet_data[0]["missiles"]["SGM-200 Tempest Block III"] = 15
+        save_updated_fleet(fleet_path, fleet_data)
+        ship = ET.parse(fleet_path).getroot().find("Ships/Ship")
+        quantities = [int(mag.find("Quantity").text) for mag in ship.iter("MagSaveData")
+                      if mag.find("MunitionKey").text == "$MODMIS$/SGM-200 Tempest Block III"]
+        self.assertEqual(quantities, [8, 7])
+
+
+class ThroughputTest(PipelineTestCase):
+    REPEATS = 3
+    ITERATIONS = 20
+
+    def setUp(self):
+        super().setUp()
+        # The baselines were measured on the stdlib backend; PipelineTestCase
+        # restores the previous backend afterwards
+        xmlbackend.set_backend("stdlib")
+
+    def best_seconds_per_call(self, func):
+        best = None
+        for _ in range(self.REPEATS):
+            start = time.perf_counter()
+            for _ in range(self.ITERATIONS):
+                func()
+            elapsed = (time.perf_counter() - start) / self.ITERATIONS
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def test_report_parse_rate(self):
+        reports_per_sec = 1 / self.best_seconds_per_call(lambda: load_report(TEST_REPORT))
+        self.assertGreaterEqual(reports_per_sec, MIN_REPORTS_PER_SEC)
+
+    def test_fleet_parse_rate(self):
+        fleet_path = os.path.join(HERE, "fleetout.fleet")
+        fleets_per_sec = 1 / self.best_seconds_per_call(lambda: parse_fleet(fleet_path))
+        self.assertGreaterEqual(fleets_per_sec, MIN_FLEETS_PER_SEC)
+
+    def test_fleet_write_time(self):
+        fleet_path = os.path.join(self.workdir, "write.fleet")
+        shutil.copy(os.path.join(HERE, "fleetout.fleet"), fleet_path)
+        fleet_data = parse_fleet(fleet_path)
+        write_ms = self.best_seconds_per_call(lambda: save_updated_fleet(fleet_path, fleet_data)) * 1000
+        self.assertLessEqual(write_ms, MAX_FLEET_WRITE_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
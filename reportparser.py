@@ -1,4 +1,118 @@
-import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Mapping, Optional, Tuple
+
+import xmlbackend
+from xmlbackend import XPath
+
+PLAYERS = XPath("Teams/TeamReportOfShipBattleReportCraftBattleReport/Players/"
+                "AARPlayerReportOfShipBattleReportCraftBattleReport")
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict used for the nested data in a ParsedReport. It stays a
+    dict subclass so it still pickles, JSON-encodes and compares like one.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+def freeze(value):
+    """Recursively converts dicts to FrozenDicts and lists to tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class ParsedReport:
+    """
+    Immutable result of parsing a skirmish report once.
+
+    Ship names have the local player's fleet prefix stripped so they can be
+    matched directly against the names stored in .fleet files, and
+    ships_by_name indexes the same ship dictionaries by that stripped name.
+    All nested dictionaries are FrozenDicts, so stages sharing the report
+    cannot change it under each other.
+    """
+    ships: Tuple[dict, ...]
+    ships_by_name: Mapping[str, dict]
+    crafts: Mapping[str, dict]
+    fleet_prefix: str
+    game_finished: bool
+    game_start_timestamp: Optional[int]
+    game_duration: Optional[int]
+    winning_team: Optional[str]
+    local_player_won: bool
+    local_player_team: Optional[str]
+
+
+def _text(root, path):
+    elem = root.find(path)
+    if elem is None or elem.text is None:
+        return None
+    return elem.text.strip()
+
+
+def _int_text(root, path):
+    text = _text(root, path)
+    return int(text) if text is not None and text.isdigit() else None
+
+
+def _local_fleet_prefix(root):
+    for player in PLAYERS(root):
+        if (_text(player, "IsLocalPlayer") or "").lower() == "true":
+            return _text(player, "Colors/FleetPrefix") or ""
+    return ""
+
+
+def load_report(xml_file):
+    """
+    Parses the report XML once and returns a ParsedReport holding the local
+    player's ships (keyed by prefix-stripped name), crafts and report metadata.
+    """
+    root = xmlbackend.parse(xml_file).getroot()
+    fleet_prefix = _local_fleet_prefix(root)
+
+    ships = []
+    crafts = {}
+    for item in _parse_ships(root):
+        if "crafts" in item:
+            # Several local player entries can report the same craft design
+            for craft_type, counts in item["crafts"].items():
+                if craft_type in crafts:
+                    crafts[craft_type]["carried"] += counts["carried"]
+                    crafts[craft_type]["lost"] += counts["lost"]
+                else:
+                    crafts[craft_type] = dict(counts)
+            continue
+        name = item["ship_name"]
+        if fleet_prefix and name.startswith(fleet_prefix):
+            name = name[len(fleet_prefix):].strip()
+        ships.append(freeze(dict(item, ship_name=name)))
+
+    return ParsedReport(
+        ships=tuple(ships),
+        ships_by_name=FrozenDict((ship["ship_name"], ship) for ship in ships),
+        crafts=freeze(crafts),
+        fleet_prefix=fleet_prefix,
+        game_finished=(_text(root, "GameFinished") or "").lower() == "true",
+        game_start_timestamp=_int_text(root, "GameStartTimestamp"),
+        game_duration=_int_text(root, "GameDuration"),
+        winning_team=_text(root, "WinningTeam"),
+        local_player_won=(_text(root, "LocalPlayerWon") or "").lower() == "true",
+        local_player_team=_text(root, "LocalPlayerTeam"),
+    )
+
 
 def parse_report(xml_file):
     """
@@ -20,8 +134,11 @@ def parse_report(xml_file):
          "restores": dict        # each restore type maps to a dict with "total", "consumed" and "remaining"
       }
     """
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
+    tree = xmlbackend.parse(xml_file)
+    return _parse_ships(tree.getroot())
+
+
+def _parse_ships(root):
     ships_list = []
     
     # iterate over all teams
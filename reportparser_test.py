@@ -0,0 +1,65 @@
+import os
+import copy
+import pickle
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from reportparser import load_report, parse_report
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_REPORT = os.path.join(HERE, "testreport.xml")
+
+
+class LoadReportTest(unittest.TestCase):
+    def test_names_are_prefix_stripped_and_indexed(self):
+        report = load_report(TEST_REPORT)
+        self.assertEqual(report.fleet_prefix, "ANS")
+        self.assertEqual(list(report.ships_by_name), ["Arel J. Romo", "Crisp Mock", "Scrub Triad"])
+        for ship in report.ships:
+            self.assertIs(report.ships_by_name[ship["ship_name"]], ship)
+        self.assertEqual((report.winning_team, report.local_player_team, report.game_duration),
+                         ("TeamA", "TeamA", 378))
+
+    def test_matches_parse_report(self):
+        report = load_report(TEST_REPORT)
+        ships = [item for item in parse_report(TEST_REPORT) if "ship_name" in item]
+        for parsed, ship in zip(report.ships, ships):
+            self.assertEqual(dict(parsed, ship_name=ship["ship_name"]), ship)
+
+    def test_nested_data_is_read_only(self):
+        report = load_report(TEST_REPORT)
+        ship = report.ships_by_name["Crisp Mock"]
+        with self.assertRaises(TypeError):
+            ship["munitions"].clear()
+        with self.assertRaises(TypeError):
+            ship["restores"]["total"] = 0
+        with self.assertRaises(TypeError):
+            report.crafts["Extra"] = {}
+
+    def test_pickles_and_copies(self):
+        report = load_report(TEST_REPORT)
+        self.assertEqual(pickle.loads(pickle.dumps(report)), report)
+        self.assertEqual(copy.deepcopy(report), report)
+
+    def test_crafts_from_several_local_entries_are_summed(self):
+        tree = ET.parse(TEST_REPORT)
+        players = tree.getroot().find("Teams/TeamReportOfShipBattleReportCraftBattleReport/Players")
+        local = players[0]
+        craft = local.find("Craft")
+        report_elem = ET.SubElement(craft, "CraftBattleReport")
+        ET.SubElement(report_elem, "DesignName").text = "Spyglass"
+        ET.SubElement(report_elem, "Carried").text = "4"
+        ET.SubElement(report_elem, "Lost").text = "1"
+        players.append(copy.deepcopy(local))
+
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        report_path = os.path.join(workdir, "crafts.xml")
+        tree.write(report_path)
+        self.assertEqual(load_report(report_path).crafts, {"Spyglass": {"carried": 8, "lost": 2}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import logging
+import threading
+from dataclasses import fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from reportparser import load_report
+from fleetparser import parse_fleet
+
+
+def _normalize(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _encode(payload):
+    return json.dumps(payload).encode("utf-8")
+
+
+def _encode_report(report_path, report):
+    payload = {"path": report_path}
+    # ships_by_name only re-indexes ships, so leave it out of the payload
+    payload.update((field.name, getattr(report, field.name)) for field in fields(report)
+                   if field.name != "ships_by_name")
+    return _encode(payload)
+
+
+def _encode_fleet(fleet_path, fleet_data):
+    return _encode({"path": fleet_path, "ships": fleet_data})
+
+
+class CampaignState:
+    """
+    In-memory cache of the latest processed report, fleets and processing
+    metrics. Payloads are JSON-encoded when published so queries only copy
+    bytes and never read the XML on disk.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._report = None       # (normalized path, encoded payload)
+        self._fleets = {}         # normalized path -> encoded payload
+        self._latest_fleet = None
+        self._started = time.time()
+        self._metrics = {
+            "reports_processed": 0,
+            "reports_failed": 0,
+            "last_report": None,
+            "last_processed_at": None,
+            "last_processing_ms": None,
+            "total_processing_ms": 0.0,
+        }
+
+    def publish_report(self, report_path, report):
+        encoded = _encode_report(report_path, report)
+        with self._lock:
+            self._report = (_normalize(report_path), encoded)
+
+    def publish_fleet(self, fleet_path, fleet_data):
+        """Caches fleet_data and makes it the fleet served by /fleet."""
+        encoded = _encode_fleet(fleet_path, fleet_data)
+        key = _normalize(fleet_path)
+        with self._lock:
+            self._fleets[key] = encoded
+            self._latest_fleet = key
+
+    def record_processing(self, report_path, elapsed_seconds, succeeded):
+        elapsed_ms = elapsed_seconds * 1000.0
+        with self._lock:
+            metrics = self._metrics
+            metrics["reports_processed" if succeeded else "reports_failed"] += 1
+            metrics["last_report"] = report_path
+            metrics["last_processed_at"] = time.time()
+            metrics["last_processing_ms"] = elapsed_ms
+            metrics["total_processing_ms"] += elapsed_ms
+
+    def invalidate(self, path):
+        """Drops any cached payload that was built from path."""
+        key = _normalize(path)
+        with self._lock:
+            if self._report is not None and self._report[0] == key:
+                self._report = None
+            if self._fleets.pop(key, None) is not None and self._latest_fleet == key:
+                self._latest_fleet = None
+
+    def refresh(self, path):
+        """
+        Re-parses path if it backs a cached payload and replaces that payload
+        in place, without changing which fleet is the latest. If parsing fails
+        (e.g. the file is still being written) the previous payload is kept
+        until the next change to the file.
+        """
+        key = _normalize(path)
+        with self._lock:
+            is_report = self._report is not None and self._report[0] == key
+            is_fleet = key in self._fleets
+        if not (is_report or is_fleet):
+            return
+        try:
+            if is_report:
+                encoded = _encode_report(path, load_report(path))
+                with self._lock:
+                    if self._report is not None and self._report[0] == key:
+                        self._report = (key, encoded)
+            if is_fleet:
+                encoded = _encode_fleet(path, parse_fleet(path))
+                with self._lock:
+                    if key in self._fleets:
+                        self._fleets[key] = encoded
+        except Exception as e:
+            logging.warning(f"Keeping cached state for {path}, refresh failed: {e}")
+
+    def report_json(self):
+        with self._lock:
+            return self._report[1] if self._report is not None else None
+
+    def fleet_json(self):
+        with self._lock:
+            return self._fleets.get(self._latest_fleet)
+
+    def metrics_json(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["cached_fleets"] = len(self._fleets)
+        attempts = metrics["reports_processed"] + metrics["reports_failed"]
+        metrics["mean_processing_ms"] = metrics["total_processing_ms"] / attempts if attempts else None
+        metrics["uptime_seconds"] = time.time() - self._started
+        return _encode(metrics)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    routes = {
+        "/report": CampaignState.report_json,
+        "/fleet": CampaignState.fleet_json,
+        "/metrics": CampaignState.metrics_json,
+    }
+
+    def do_GET(self):
+        route = self.routes.get(self.path.split("?", 1)[0].rstrip("/"))
+        if route is None:
+            self._send(404, _encode({"error": "not found", "endpoints": sorted(self.routes)}))
+            return
+        body = route(self.server.state)
+        if body is None:
+            self._send(404, _encode({"error": "no data yet"}))
+        else:
+            self._send(200, body)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Query server: {format % args}")
+
+
+def start_query_server(state, port, host="127.0.0.1"):
+    """Serves state as JSON from a daemon thread and returns the running server."""
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, name="query-server", daemon=True).start()
+    logging.info(f"Serving campaign state on http://{host}:{server.server_port}")
+    return server
@@ -0,0 +1,128 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+
+from reportparser import load_report
+from fleetparser import parse_fleet
+from stateserver import CampaignState, start_query_server
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_REPORT = os.path.join(HERE, "testreport.xml")
+
+
+class QueryServerTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.state = CampaignState()
+        server = start_query_server(self.state, 0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = f"http://127.0.0.1:{server.server_port}"
+
+    def get(self, path):
+        """Returns (status, decoded JSON body) for a GET request."""
+        try:
+            with urllib.request.urlopen(self.base_url + path) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            with e:
+                return e.code, json.load(e)
+
+    def copy_sample(self, name, target_name=None):
+        path = os.path.join(self.workdir, target_name or name)
+        shutil.copy(os.path.join(HERE, name), path)
+        return path
+
+    def publish_fleet(self, name, target_name=None):
+        path = self.copy_sample(name, target_name)
+        self.state.publish_fleet(path, parse_fleet(path))
+        return path
+
+    def test_no_data_yet(self):
+        for path in ("/report", "/fleet"):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path), (404, {"error": "no data yet"}))
+        status, body = self.get("/unknown")
+        self.assertEqual(status, 404)
+        self.assertEqual(body["endpoints"], ["/fleet", "/metrics", "/report"])
+
+    def test_publish_report(self):
+        self.state.publish_report(TEST_REPORT, load_report(TEST_REPORT))
+        status, body = self.get("/report")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["path"], TEST_REPORT)
+        self.assertEqual(body["winning_team"], "TeamA")
+        self.assertEqual([ship["ship_name"] for ship in body["ships"]],
+                         ["Arel J. Romo", "Crisp Mock", "Scrub Triad"])
+        self.assertNotIn("ships_by_name", body)
+
+    def test_publish_fleet(self):
+        path = self.publish_fleet("fleetout.fleet")
+        status, body = self.get("/fleet")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {"path": path, "ships": parse_fleet(path)})
+
+    def test_metrics(self):
+        self.state.record_processing("a.xml", 0.010, True)
+        self.state.record_processing("b.xml", 0.030, False)
+        status, body = self.get("/metrics")
+        self.assertEqual(status, 200)
+        self.assertEqual((body["reports_processed"], body["reports_failed"]), (1, 1))
+        self.assertEqual(body["last_report"], "b.xml")
+        self.assertAlmostEqual(body["last_processing_ms"], 30.0)
+        self.assertAlmostEqual(body["mean_processing_ms"], 20.0)
+
+    def test_refresh_keeps_latest_fleet(self):
+        older = self.publish_fleet("testfleet.fleet", "older.fleet")
+        latest = self.publish_fleet("fleetout.fleet", "latest.fleet")
+        shutil.copy(os.path.join(HERE, "fleetout.fleet"), older)
+
+        self.state.refresh(older)
+        self.assertEqual(self.get("/fleet")[1]["path"], latest)
+        # The older entry was refreshed in place; publishing it again shows the new contents
+        self.state.publish_fleet(older, parse_fleet(older))
+        self.assertEqual(self.get("/fleet")[1]["ships"], parse_fleet(latest))
+
+    def test_failed_refresh_keeps_cached_payload(self):
+        path = self.publish_fleet("fleetout.fleet")
+        before = self.get("/fleet")
+        with open(path, "w") as f:
+            f.write("<Fleet><Ships>")  # partially written file
+        with self.assertLogs(level="WARNING"):
+            self.state.refresh(path)
+        self.assertEqual(self.get("/fleet"), before)
+
+        shutil.copy(os.path.join(HERE, "testfleet.fleet"), path)
+        self.state.refresh(path)
+        self.assertEqual(self.get("/fleet")[1]["ships"], parse_fleet(path))
+
+    def test_refresh_report(self):
+        path = self.copy_sample("testreport.xml")
+        self.state.publish_report(path, load_report(path))
+        with open(path, encoding="utf-8") as f:
+            contents = f.read()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(contents.replace("<WinningTeam>TeamA", "<WinningTeam>TeamB"))
+        self.state.refresh(path)
+        self.assertEqual(self.get("/report")[1]["winning_team"], "TeamB")
+
+    def test_invalidate(self):
+        report_path = self.copy_sample("testreport.xml")
+        self.state.publish_report(report_path, load_report(report_path))
+        fleet_path = self.publish_fleet("fleetout.fleet")
+
+        self.state.invalidate(fleet_path)
+        self.assertEqual(self.get("/fleet")[0], 404)
+        self.assertEqual(self.get("/report")[0], 200)
+        self.state.invalidate(report_path)
+        self.assertEqual(self.get("/report")[0], 404)
+        self.assertEqual(self.get("/metrics")[1]["cached_fleets"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
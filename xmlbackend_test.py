@@ -0,0 +1,60 @@
+import os
+import unittest
+import warnings
+
+import xmlbackend
+from reportparser import load_report, parse_report
+from fleetparser import parse_fleet
+from pipeline_test import HERE, TEST_REPORT, VARIANTS, PipelineTestCase
+
+HAVE_LXML = "lxml" in xmlbackend.BACKENDS
+SKIP_REASON = "lxml is not installed; run `pip install lxml` to check backend parity"
+SAMPLE_FLEETS = ("testfleet.fleet", "fleetout.fleet")
+
+if not HAVE_LXML:
+    warnings.warn(f"Backend parity tests skipped: {SKIP_REASON}")
+
+
+class XPathTest(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(xmlbackend.set_backend, xmlbackend.get_backend().name)
+
+    def test_xsi_type_selection(self):
+        query = xmlbackend.XPath("Ships/Ship/SocketMap/HullSocket/ComponentData[@xsi:type='BulkMagazineData']")
+        for backend in xmlbackend.BACKENDS:
+            with self.subTest(backend=backend):
+                xmlbackend.set_backend(backend)
+                root = xmlbackend.parse(os.path.join(HERE, "testfleet.fleet")).getroot()
+                matches = query(root)
+                self.assertEqual(len(matches), 3)
+                self.assertTrue(all(match.get(xmlbackend.XSI_TYPE) == "BulkMagazineData" for match in matches))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            xmlbackend.set_backend("expat")
+
+
+@unittest.skipUnless(HAVE_LXML, SKIP_REASON)
+class BackendParityTest(PipelineTestCase):
+    def test_backends_parse_sample_files_identically(self):
+        results = {}
+        for backend in ("stdlib", "lxml"):
+            xmlbackend.set_backend(backend)
+            results[backend] = (load_report(TEST_REPORT),
+                                parse_report(TEST_REPORT),
+                                [parse_fleet(os.path.join(HERE, name)) for name in SAMPLE_FLEETS])
+        self.assertEqual(results["stdlib"], results["lxml"])
+
+    def test_backends_write_identical_bytes(self):
+        for variant in VARIANTS:
+            with self.subTest(variant=variant):
+                outputs = {}
+                for backend in ("stdlib", "lxml"):
+                    xmlbackend.set_backend(backend)
+                    with open(self.run_pipeline(variant, os.path.join(self.workdir, backend)), "rb") as f:
+                        outputs[backend] = f.read()
+                self.assertEqual(outputs["stdlib"], outputs["lxml"])
+
+
+if __name__ == "__main__":
+    unittest.main()